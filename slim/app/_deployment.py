@@ -11,19 +11,25 @@ from builtins import zip
 from builtins import object
 
 from collections.abc import Mapping
-from collections import  deque  # pylint: disable=no-name-in-module
-from fnmatch import fnmatch
-from json import JSONEncoder
+from collections import OrderedDict, defaultdict, deque  # pylint: disable=no-name-in-module
+from fnmatch import translate as fnmatch_translate
+from hashlib import sha1
+
+import json
 
 from os import makedirs, path
+from time import time
 
 from tarfile import TarFile, TarInfo
 import tarfile
 
+import contextlib
 import errno
 import io
 import re
 import shutil
+import subprocess
+import sys
 
 from . _internal.json_data import *
 from .. rules import *
@@ -32,41 +38,91 @@ from .. utils import SlimStatus, SlimConstants, SlimIgnore, SlimLogger, encode_f
 from .. utils.internal import hash_object, string
 from .. utils.public import SlimTargetOSWildcard
 
-from . _internal import ObjectView, OrderedSet
+from . _internal import ObjectView
 
 
-class _AppJsonEncoder(JSONEncoder):
+def _encode_default(value):
+    try:
+        return value.to_dict()
+    except AttributeError:
+        pass
+    if isinstance(value, (Version, semantic_version.Spec)):
+        return string(value)
+    if isinstance(value, ObjectView):
+        return value.__dict__
+    if isinstance(value, Iterable):
+        return list(value)
+    raise TypeError('Object of type ' + type(value).__name__ + ' is not JSON serializable')
 
-    def __init__(self, indent=False):
-        if indent:
-            separators = None
-            indent = 2
-        else:
-            separators = (',', ':')
-            indent = None
-        JSONEncoder.__init__(self, ensure_ascii=False, indent=indent, separators=separators)
-
-    # pylint: disable=method-hidden
-    def default(self, value):  # pylint: disable=arguments-differ
-        # Confirmed by code inspection: under Python 2.7.11 pylint incorrectly asserts AppJsonEncoder.default is hidden
-        # by an attribute defined in json.encoder line 162. Code inspection reveals this not to be the case, hence we
-        # disable the method-hidden message
+
+def _encode(value):
+    # json.dumps with a default function takes the one-shot C encoder path; a JSONEncoder subclass with an overridden
+    # default method builds three mutually recursive closures per call and leaves reference cycles for the GC
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_encode_default)
+
+
+def _dump(value, ostream):
+    # json.dump writes the encoding to `ostream` chunk by chunk rather than materializing one contiguous string
+    json.dump(value, ostream, ensure_ascii=False, separators=(',', ':'), default=_encode_default)
+
+
+def _archive_extension():
+    return '.tar' if slim_configuration.compression_level == 0 else '.tar.gz'
+
+
+@contextlib.contextmanager
+def _open_tar_package(archive_path, compresslevel, dereference=False):
+    """ Opens `archive_path` for writing as a gzipped tarball, or as a plain tarball when `compresslevel` is zero.
+
+    Skipping compression altogether makes sense when the package is bound for a transport or store that compresses on
+    its own. Otherwise, when pigz is on PATH the uncompressed tar stream is piped through it so that DEFLATE runs on
+    all cores; this keeps the archive format identical to Python's single-threaded gzip codec, which is used when pigz
+    is unavailable.
+
+    """
+    if compresslevel == 0:
+        with tarfile.open(archive_path, mode='w', encoding='utf-8', dereference=dereference) as package:
+            yield package
+        return
+
+    pigz = shutil.which('pigz')
+
+    if pigz is None:
+        with TarFile.gzopen(
+                archive_path, mode='w', compresslevel=compresslevel, encoding='utf-8',
+                dereference=dereference) as package:
+            yield package
+        return
+
+    with io.open(archive_path, mode='wb') as ostream:
+        process = subprocess.Popen([pigz, '-' + string(compresslevel)], stdin=subprocess.PIPE, stdout=ostream)
         try:
-            return value.to_dict()
-        except AttributeError:
-            pass
-        if isinstance(value, (Version, semantic_version.Spec)):
-            return string(value)
-        if isinstance(value, ObjectView):
-            return value.__dict__
-        if isinstance(value, Iterable):
-            return list(value)
-        return JSONEncoder.default(self, value)
+            with tarfile.open(
+                    mode='w|', fileobj=process.stdin, encoding='utf-8', dereference=dereference) as package:
+                yield package
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                SlimLogger.error(
+                    'Cannot compress ', encode_filename(archive_path), ': pigz exited with status ',
+                    process.returncode)
 
 
-_encoder = _AppJsonEncoder()
-_encode = _encoder.encode
-_iterencode = _encoder.iterencode
+class _HashingReader(object):
+    """ A file-like object that feeds a git-style blob hash with every block read from the underlying stream
+
+    """
+    def __init__(self, fileobj, size):
+        self._fileobj = fileobj
+        self._hash = sha1(b'blob ' + str(size).encode() + b'\0')
+
+    def read(self, size=-1):
+        data = self._fileobj.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self):
+        return string(self._hash.hexdigest())
 
 
 class AppDependencyGraph(Mapping):
@@ -77,8 +133,8 @@ class AppDependencyGraph(Mapping):
 
         self._root = app_source
         self._description = None
-        self._graph = OrderedDict()
-        self._dependents = OrderedDict()
+        self._graph = {}
+        self._dependents = defaultdict(deque)
         self._installed_packages = installed_packages
         self._dependency_sources = app_source.dependency_sources
         self._repository_sources = app_source.populate_dependency_sources(path.abspath(repository), installed_packages)
@@ -158,9 +214,11 @@ class AppDependencyGraph(Mapping):
         app_name = source.id
         app_package = source.package_prefix
 
-        source_package_path = path.join(output_dir, app_package + '.tar.gz')
+        source_package_path = path.join(output_dir, app_package + _archive_extension())
 
-        with TarFile.gzopen(source_package_path, mode='w', compresslevel=9, encoding='utf-8') as source_package:
+        compresslevel = slim_configuration.compression_level
+
+        with _open_tar_package(source_package_path, compresslevel) as source_package:
 
             source_package.add(source.directory, arcname=app_name, filter=SlimIgnore(app_name, source.directory).filter)
 
@@ -177,7 +235,7 @@ class AppDependencyGraph(Mapping):
                     source_package.add(package, arcname=path.join('.dependencies', path.basename(package)))
 
             slim_configuration.payload.set_source_package(source_package_path)
-            return source_package.name
+            return source_package_path
 
     def get_deployment_specifications(self, deployment_specification):
         """ Returns an ordered dictionary of AppDeploymentSpecification objects derived from deployment_specification
@@ -190,10 +248,10 @@ class AppDependencyGraph(Mapping):
 
         if input_groups is None or input_groups == AppDeploymentSpecification.all_input_groups:
             # Each app receives the same deployment specification in the absence of input groups
-            result = OrderedDict(((source, deployment_specification) for source in self._graph))
+            result = dict(((source, deployment_specification) for source in self._graph))
         else:
             # Deployment specifications vary based on the input group requirements of the root app, transitively
-            result = OrderedDict()
+            result = {}
             self._get_deployment_specifications(self._root, deployment_specification, result)
 
         return result
@@ -209,6 +267,8 @@ class AppDependencyGraph(Mapping):
         reported_unreferenced_input_groups = False
         repository_sources = self._repository_sources
         union_of = AppDependencyGraph._union_of
+        all_input_groups = AppDeploymentSpecification.all_input_groups
+        no_input_groups = AppDeploymentSpecification.no_input_groups
 
         for app_source in self._graph:  # pylint: disable=too-many-nested-blocks
 
@@ -218,7 +278,7 @@ class AppDependencyGraph(Mapping):
             if input_groups is None:
                 continue
 
-            referenced_dependencies = OrderedDict((app_dependency, frozenset()) for app_dependency in app_dependencies)
+            referenced_dependencies = dict.fromkeys(app_dependencies, no_input_groups)
             dependency_declarations = app_source.manifest.dependencies
 
             if dependency_declarations is not None:
@@ -232,10 +292,12 @@ class AppDependencyGraph(Mapping):
                         dependency_source = repository_sources[dependency_package]
                         references = referenced_dependencies[dependency_source]
                         dependency_groups = group_requires[dependency_name]
-                        referenced_dependencies[dependency_source] = union_of(references, dependency_groups)
-
-            all_input_groups = AppDeploymentSpecification.all_input_groups
-            no_input_groups = AppDeploymentSpecification.no_input_groups
+                        if references is no_input_groups:
+                            # Collapse '*' on the first merge too, or the all_input_groups test below misfires
+                            references = all_input_groups if '*' in dependency_groups else frozenset(dependency_groups)
+                        else:
+                            references = union_of(references, dependency_groups)
+                        referenced_dependencies[dependency_source] = references
 
             for dependency_source in referenced_dependencies:
                 references = referenced_dependencies[dependency_source]
@@ -246,11 +308,9 @@ class AppDependencyGraph(Mapping):
                     count = len(unreferenced)
                     if count > 0:
                         if count == 1:
-                            for unreferenced in unreferenced:
-                                pass
                             SlimLogger.message(
                                 level, app_source.qualified_id, ': unreferenced input group: dependency ',
-                                dependency_source.qualified_id, ': ', unreferenced)
+                                dependency_source.qualified_id, ': ', next(iter(unreferenced)))
                         else:
                             unreferenced = sorted(unreferenced)
                             SlimLogger.message(
@@ -270,12 +330,12 @@ class AppDependencyGraph(Mapping):
         visited = set()
 
         while len(queue) > 0:
-            app_source = queue.pop()
+            app_source = queue.popleft()
             if app_source not in visited:
                 dependency_sources = graph[app_source]
                 dependent_sources = app_dependents.get(app_source)
                 dependency_sources = visit(app_source, dependency_sources, dependent_sources)
-                queue.extendleft(dependency_sources)
+                queue.extend(dependency_sources)
                 visited.add(app_source)
 
         return app_dependents
@@ -291,41 +351,70 @@ class AppDependencyGraph(Mapping):
         queue = deque((app_source,))
         graph = self._graph
         while len(queue) > 0:
-            app_source = queue.pop()
+            app_source = queue.popleft()
             if app_source not in graph:
                 app_source._dependencies = app_dependencies = self._get_dependencies(app_source)
                 for app_dependency, app_dependency_source in app_dependencies:
-                    dependents = app_dependents.get(app_dependency_source)
-                    if dependents is None:
-                        dependents = deque()
-                    dependents.append((app_dependency, app_source))
-                    app_dependents[app_dependency_source] = dependents
+                    app_dependents[app_dependency_source].append((app_dependency, app_source))
                 dependency_sources = [ds for _, ds in app_dependencies]
-                graph[app_source] = OrderedSet(dependency_sources)
-                queue.extendleft(dependency_sources)
+                graph[app_source] = dict.fromkeys(dependency_sources)
+                queue.extend(dependency_sources)
         return app_dependents
 
     def _check_dependencies(self):
-        for app_source, dependents in list(self._dependents.items()):
+
+        # One pass extracts the selected version and required range for every edge; the match loop below then runs
+        # over locals without re-walking the manifest attribute chain per dependent
+
+        checks = []
+
+        for app_source, dependents in self._dependents.items():
             version = app_source.manifest.info.id.version
             for dependency, dependent_source in dependents:
-                version_range = dependency.version
-                if not version_range.match(version):
-                    SlimLogger.error(
-                        app_source.id, ': Version ', version, ' was selected, but version ', version_range, ' is '
-                        'required by ', dependent_source.qualified_id)
+                checks.append((app_source, version, dependency.version, dependent_source))
+
+        for app_source, version, version_range, dependent_source in checks:
+            if not version_range.match(version):
+                SlimLogger.error(
+                    app_source.id, ': Version ', version, ' was selected, but version ', version_range, ' is '
+                    'required by ', dependent_source.qualified_id)
 
     def _describe(self, app_source, level):
-        graph_output = ''
+        parts = []
         if level == 1:
-            graph_output += '|-- ' + app_source.id + '@' + string(app_source.version) + '\n'
-        for app_dependency, app_dependency_source in app_source.dependencies:
-            graph_output += '|' + '   ' * level + \
-                            '|-- ' + app_dependency_source.id + \
-                            '@' + string(app_dependency_source.version) + \
-                            ' (accepting ' + str(app_dependency.version) + ')\n'
-            graph_output += self._describe(app_dependency_source, level + 1)
-        return graph_output
+            parts.append('|-- ' + app_source.id + '@' + string(app_source.version) + '\n')
+        parts.append(self._describe_dependencies(app_source, level, {}))
+        return ''.join(parts)
+
+    def _describe_dependencies(self, app_source, level, memo):
+        """ Renders the dependency subtree of `app_source`, one line per edge, indented by depth.
+
+        Shared sub-graphs are rendered once and re-indented on reuse because re-walking them once per incoming edge
+        makes the description exponential in graph depth.
+
+        """
+        subtree = memo.get(app_source)
+
+        if subtree is None:
+            reindent = AppDependencyGraph._reindent
+            parts = []
+            for app_dependency, app_dependency_source in app_source.dependencies:
+                parts.append(
+                    '|   '
+                    '|-- ' + app_dependency_source.id +
+                    '@' + string(app_dependency_source.version) +
+                    ' (accepting ' + str(app_dependency.version) + ')\n')
+                parts.append(reindent(self._describe_dependencies(app_dependency_source, 1, memo), 1))
+            subtree = memo[app_source] = ''.join(parts)
+
+        return AppDependencyGraph._reindent(subtree, level - 1)
+
+    @staticmethod
+    def _reindent(description, levels):
+        if levels == 0 or len(description) == 0:
+            return description
+        pad = '   ' * levels
+        return ('\n' + description).replace('\n|', '\n|' + pad)[1:]
 
     def _get_dependencies(self, app_source):
 
@@ -384,76 +473,138 @@ class AppDependencyGraph(Mapping):
     # TODO: SPL-123967: Reduce the number of locals or otherwise refactor this code to make it more understandable (?)
     # pylint: disable=too-many-locals
     def _get_deployment_specifications(self, app_source, deployment_specification, result):
+        """ Computes the deployment specification for `app_source` and, transitively, its dependencies into `result`.
 
-        result[app_source] = deployment_specification
+        Processed iteratively to a fixed point: a dependency subtree is only revisited when the input groups computed
+        for its root actually grow, so shared sub-graphs are not re-walked once per incoming edge.
+
+        """
         union_of = AppDependencyGraph._union_of
-        dependencies = app_source.manifest.dependencies
+        no_input_groups = AppDeploymentSpecification.no_input_groups
+        specification_cache = AppDependencyGraph._specification_cache
+        specification_name = deployment_specification.name
+        workload = deployment_specification.workload
 
-        # Build a dictionary of dependent app requirements
+        work = [(app_source, deployment_specification)]
 
-        input_groups = app_source.manifest.inputGroups
-        requirements = OrderedDict()
+        while len(work) > 0:
 
-        if input_groups is not None:
+            app_source, deployment_specification = work.pop()
+            result[app_source] = deployment_specification
+            dependencies = app_source.manifest.dependencies
 
-            for name in deployment_specification.inputGroups:
-                group = input_groups.get(name)
-                if group is None:
-                    continue
-                try:
-                    aliases = group.requires
-                except AttributeError:
-                    continue
-                for alias in aliases:
-                    requirement = group.requires[alias]
-                    dependency = dependencies[alias]
-                    dependency_source = self._repository_sources[dependency.package]
-                    assert dependency_source in self._graph[app_source], 'Dependency graph is corrupt'
-                    requirements[dependency_source] = union_of(
-                        requirements.get(dependency_source, AppDeploymentSpecification.no_input_groups), requirement
-                    )
-
-        # Add dependency sources to the `result`, taking requirements into account
-
-        for dependency, dependency_source in app_source.dependencies:
-            input_groups = requirements.get(dependency_source, AppDeploymentSpecification.no_input_groups)
-            if dependency_source in result:
-                dependency_deployment_specification = AppDeploymentSpecification((
-                    ('name', deployment_specification.name), ('workload', deployment_specification.workload),
-                    ('inputGroups', union_of(result[dependency_source].inputGroups, input_groups))))
-            else:
-                dependency_deployment_specification = AppDeploymentSpecification((
-                    ('name', deployment_specification.name), ('workload', deployment_specification.workload),
-                    ('inputGroups', input_groups)))
-            self._get_deployment_specifications(dependency_source, dependency_deployment_specification, result)
+            # Build a dictionary of dependent app requirements
+
+            input_groups = app_source.manifest.inputGroups
+            requirements = {}
+
+            if input_groups is not None:
+
+                for name in deployment_specification.inputGroups:
+                    group = input_groups.get(name)
+                    if group is None:
+                        continue
+                    try:
+                        aliases = group.requires
+                    except AttributeError:
+                        continue
+                    for alias in aliases:
+                        requirement = group.requires[alias]
+                        dependency = dependencies[alias]
+                        dependency_source = self._repository_sources[dependency.package]
+                        assert dependency_source in self._graph[app_source], 'Dependency graph is corrupt'
+                        existing = requirements.get(dependency_source)
+                        requirements[dependency_source] = \
+                            frozenset(requirement) if existing is None else union_of(existing, requirement)
+
+            # Add dependency sources to the `result`, taking requirements into account
+
+            for dependency, dependency_source in app_source.dependencies:
+                input_groups = requirements.get(dependency_source, no_input_groups)
+                current = result.get(dependency_source)
+                if current is not None:
+                    input_groups = union_of(current.inputGroups, input_groups)
+                    if input_groups == current.inputGroups:
+                        continue  # the subtree result is already a fixed point for these input groups
+                key = (specification_name, workload, input_groups)
+                dependency_deployment_specification = specification_cache.get(key)
+                if dependency_deployment_specification is None:
+                    dependency_deployment_specification = specification_cache[key] = AppDeploymentSpecification((
+                        ('name', specification_name), ('workload', workload),
+                        ('inputGroups', input_groups)))
+                work.append((dependency_source, dependency_deployment_specification))
 
     def _is_cyclic(self):
         """ Returns True if this dependency graph is cyclic.
 
+        Implemented as an iterative Tarjan strongly-connected-components pass so that deep graphs neither exceed the
+        interpreter recursion limit nor pay per-frame function call costs. The graph is cyclic when a component
+        contains more than one node or a node depends on itself.
+
         """
         graph = self._graph
-        graph_path = set()
-        visited = set()
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
 
-        def visit(app_source):
-            if app_source in visited:
-                return False
-            visited.add(app_source)
-            graph_path.add(app_source)
-            for neighbour in graph.get(app_source, ()):
-                if neighbour in graph_path or visit(neighbour):
-                    return True
-            graph_path.remove(app_source)
-            return False
+        for root in graph:
 
-        return any(visit(app_source) for app_source in graph)
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph.get(root, ())))]
+
+            while len(work) > 0:
+                node, neighbours = work[-1]
+                for neighbour in neighbours:
+                    if neighbour == node:
+                        return True  # self-loop
+                    if neighbour not in index:
+                        index[neighbour] = lowlink[neighbour] = len(index)
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append((neighbour, iter(graph.get(neighbour, ()))))
+                        break
+                    if neighbour in on_stack:
+                        lowlink[node] = min(lowlink[node], index[neighbour])
+                else:
+                    work.pop()
+                    if lowlink[node] == index[node]:
+                        count = 0
+                        while True:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            count += 1
+                            if member == node:
+                                break
+                        if count > 1:
+                            return True
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+        return False
 
     @staticmethod
     def _union_of(fg_1, fg_2):
-        return AppDeploymentSpecification.all_input_groups if '*' in fg_1 or '*' in fg_2 else fg_1.union(fg_2)
+        all_input_groups = AppDeploymentSpecification.all_input_groups
+        if fg_1 is all_input_groups or fg_2 is all_input_groups:
+            return all_input_groups
+        if '*' in fg_1 or '*' in fg_2:
+            return all_input_groups
+        return fg_1.union(fg_2)
 
     _forwarder_workload = frozenset(('forwarder',))
 
+    # Interns the specifications computed for dependencies so that diamond graphs share one object per distinct
+    # (name, workload, input groups) triple; entries are never mutated once constructed
+
+    _specification_cache = {}
+
     # endregion
     pass  # pylint: disable=unnecessary-pass
 
@@ -475,7 +626,7 @@ class AppDeploymentPackage(object):
 
         self._name = '-'.join((part for part in (group, name, string(version)) if part is not None))
         self._stage_name = self._name + '-' + deployment_specification.name
-        self._archive_name = self._stage_name + '.tar.gz'
+        self._archive_name = self._stage_name + _archive_extension()
 
         # TODO: Do we need rules to exclude files referenced by the info section of app.manifest (e.g., license files)?
         # TODO: Should we partition spec files?
@@ -483,6 +634,8 @@ class AppDeploymentPackage(object):
         # Partition the app_source's configuration consistent with the current deployment specification
 
         relevant_configurations = OrderedDict()
+        app_root_sep = app_root + os.sep
+        app_root_sep_length = len(app_root_sep)
 
         for configuration_file in app_configuration.files():
             # TODO: Lookup packaging rule for any stanza, falling back to the DefaultPackagingRule.instance()
@@ -499,7 +652,11 @@ class AppDeploymentPackage(object):
                     if package.should_include_stanza(stanza, relevant_settings, deployment_specification, app_manifest):
                         relevant_stanzas[stanza.name] = relevant_settings
                 if len(relevant_stanzas) > 0:
-                    file_name = section.name[len(path.commonprefix((app_root, section.name))) + 1:]
+                    section_name = section.name
+                    if section_name.startswith(app_root_sep):
+                        file_name = section_name[app_root_sep_length:]
+                    else:
+                        file_name = section_name[len(path.commonprefix((app_root, section_name))) + 1:]
                     relevant_files[file_name] = relevant_stanzas
             if len(relevant_files) > 0:
                 relevant_configurations[configuration_file.name] = relevant_files
@@ -569,6 +726,16 @@ class AppDeploymentPackage(object):
 
     # region Methods
 
+    def dump(self, ostream):
+        """ Writes the JSON representation of the current deployment package to `ostream` incrementally
+
+        """
+        _dump(OrderedDict((
+            ('name', self._name),
+            ('archive_name', self._archive_name),
+            ('configuration', self._configuration)
+        )), ostream)
+
     def export(self, output_dir):
         """ Exports the current targeted deployment package as a gzipped tarball
 
@@ -576,29 +743,20 @@ class AppDeploymentPackage(object):
         is_debug_enabled = SlimLogger.is_debug_enabled()
 
         if not is_debug_enabled:
-            append_digest = None
             digest = None
         else:
             filename = path.join(output_dir, self._stage_name + '.configuration.json')
 
             with io.open(filename, encoding='utf-8', mode='w', newline='') as ostream:
-                ostream.write(string(self))
+                self.dump(ostream)
 
             SlimLogger.debug(
                 'Saved ', encode_filename(self._stage_name), ' configuration to ', encode_filename(filename)
             )
 
-            def append_digest(tar_info):
-                if not tar_info.isdir():
-                    name, size = tar_info.name, tar_info.size
-                    object_id = hash_object(path.join(source_container, name), size)
-                    digest.append(OrderedDict((('name', name), ('objectId', object_id), ('size', size))))
-                return tar_info
-
-            source_container = path.dirname(self._app_root)
             digest = []
 
-        self._export(output_dir, filter=append_digest)
+        self._export(output_dir, digest=digest)
 
         if is_debug_enabled:
             filename = path.join(output_dir, self._stage_name + '.file-digest.json')
@@ -638,16 +796,16 @@ class AppDeploymentPackage(object):
                 path.join(app_root, 'metadata'),
                 path.join(app_root, 'metadata', 'default.meta')
             }
+            app_bin = path.join(app_root, 'bin')
             for asset_file in asset_filenames:
-                app_bin = path.join(app_root, 'bin')
                 if asset_file.startswith(app_bin):
                     empty_set.add(asset_file)
             for item in app_info.license, app_info.privacyPolicy, app_info.releaseNotes:
                 if item is None or item.text is None:
                     continue
-                filename = path.normpath(item.text)
-                while len(filename) > 0:
-                    empty_set.add(path.normpath(path.join(app_root, filename)))
+                filename = path.normpath(path.join(app_root, path.normpath(item.text)))
+                while len(filename) > len(app_root):
+                    empty_set.add(filename)
                     filename = path.dirname(filename)
             if asset_filenames.issubset(empty_set):
                 return True
@@ -672,9 +830,101 @@ class AppDeploymentPackage(object):
         (('README', _exclude_conf_spec), frozenset(('forwarder', 'indexer', 'searchHead')))
     )
 
-    # pylint: disable=redefined-builtin
-    # noinspection PyShadowingBuiltins
-    def _export(self, output_dir, filter=None, keep_source=False):
+    def _export(self, output_dir, digest=None, keep_source=False):
+        """ Writes the deployment package archive directly from the app root and in-memory configuration.
+
+        Assets are streamed into the archive straight from the app root and partitioned configuration files are
+        serialized into it from memory, so no staging copy of the app is made unless `keep_source` asks for one.
+        When `digest` is a list, an entry is appended for each regular file added to the archive; object IDs are
+        computed from the bytes the archive reads, so no file is read a second time for its hash.
+
+        """
+        if keep_source:
+            self._export_staged(output_dir, digest)
+            return
+
+        archive = path.join(output_dir, self._archive_name)
+        app_root = self._app_root
+        basename = path.basename(app_root)
+        asset_filenames = self._asset_filenames
+
+        # Compute the set of configuration files that are rewritten from the partitioned configuration; these are
+        # serialized from memory rather than streamed from the app root
+
+        configurations = self._configuration
+        generated_files = set()
+
+        for configuration_name in configurations:
+            generated_files.update(configurations[configuration_name])
+
+        prefix_length = len(app_root) + 1
+
+        with _open_tar_package(archive, slim_configuration.compression_level, dereference=True) as package:
+
+            def add_file(filename, arcname):
+                if digest is None:
+                    package.add(filename, arcname=arcname, recursive=False)
+                    return
+                info = package.gettarinfo(filename, arcname)
+                with io.open(filename, mode='rb') as istream:
+                    reader = _HashingReader(istream, info.size)
+                    package.addfile(info, reader)
+                digest.append(
+                    OrderedDict((('name', info.name), ('objectId', reader.hexdigest()), ('size', info.size))))
+
+            package.add(app_root, arcname=basename, recursive=False)
+            directories = {basename}
+
+            for root, directory_names, filenames in os.walk(app_root, topdown=True, followlinks=True):
+                arcroot = path.join(basename, root[prefix_length:]) if len(root) > prefix_length else basename
+                directory_names[:] = sorted(
+                    (name for name in directory_names if path.join(root, name) in asset_filenames))
+                for name in directory_names:
+                    package.add(path.join(root, name), arcname=path.join(arcroot, name), recursive=False)
+                    directories.add(path.join(arcroot, name).replace(os.sep, '/'))
+                for name in sorted(filenames):
+                    filename = path.join(root, name)
+                    if filename not in asset_filenames:
+                        continue
+                    if path.join(root, name)[prefix_length:] in generated_files:
+                        continue  # replaced by a partitioned configuration file below
+                    add_file(filename, arcname=path.join(arcroot, name))
+
+            def add_directory(arcname):
+                if len(arcname) == 0 or arcname in directories:
+                    return
+                add_directory(path.dirname(arcname))
+                info = TarInfo(arcname)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755  # rwx r-x r-x
+                package.addfile(info)
+                directories.add(arcname)
+
+            for configuration_name in configurations:
+                configuration_info = configurations[configuration_name]
+                for file_name in configuration_info:
+                    file_info = configuration_info[file_name]
+                    lines = []
+                    for stanza_name in file_info:
+                        lines.append('[' + stanza_name.replace('\n', '\\\n') + ']\n')
+                        stanza_info = file_info[stanza_name]
+                        for setting_name in stanza_info:
+                            lines.append(string(stanza_info[setting_name]) + '\n')
+                    data = ''.join(lines).encode('utf-8')
+                    # TarInfo takes names verbatim; normalize separators the way gettarinfo does for streamed assets
+                    arcname = path.join(basename, file_name).replace(os.sep, '/')
+                    add_directory(path.dirname(arcname))
+                    info = TarInfo(arcname)
+                    info.size = len(data)
+                    info.mode = 0o644  # rw- r-- r--
+                    info.mtime = time()
+                    package.addfile(info, io.BytesIO(data))
+                    if digest is not None:
+                        object_id = sha1(b'blob ' + str(info.size).encode() + b'\0' + data)
+                        digest.append(OrderedDict((
+                            ('name', arcname), ('objectId', string(object_id.hexdigest())), ('size', info.size))))
+
+    def _export_staged(self, output_dir, digest=None):
 
         source = path.join(output_dir, self._stage_name)
 
@@ -707,103 +957,194 @@ class AppDeploymentPackage(object):
         archive = path.join(output_dir, self._archive_name)
         basename = path.basename(self._app_root)
 
-        with tarfile.open(archive, 'w:gz') as package:
-            package.add(source, arcname=basename, filter=filter)
+        if digest is None:
+            append_digest = None
+        else:
+            prefix_length = len(basename) + 1
 
-        if keep_source:
-            return
+            def append_digest(tar_info):
+                if not tar_info.isdir():
+                    name, size = tar_info.name, tar_info.size
+                    object_id = hash_object(path.join(source, name[prefix_length:]), size)
+                    digest.append(OrderedDict((('name', name), ('objectId', object_id), ('size', size))))
+                return tar_info
 
-        shutil.rmtree(source)
+        with _open_tar_package(archive, slim_configuration.compression_level) as package:
+            package.add(source, arcname=basename, filter=append_digest)
 
-    def _get_excluded_filenames(self, root, names, ignore_patterns):
-        part_count = len(root) + 1
-        candidates = []
+    @classmethod
+    def _compile_ignore_patterns(cls, ignore_patterns):
+        """ Pre-translates the string parts of each ignore pattern into compiled glob matchers.
+
+        Compiling once per deployment package means the walk over the app root tests thousands of names against
+        matchers that already exist instead of translating the same few globs over and over.
+
+        """
+        glob_matcher = cls._glob_matcher
+        patterns_by_depth = {}
 
         for ignore_pattern in ignore_patterns:
-            if len(ignore_pattern) != part_count:
-                continue
+            prefix_matchers = tuple(glob_matcher(pattern) for pattern in ignore_pattern[:-1])
+            name_pattern = ignore_pattern[-1]
+            is_literal = isinstance(name_pattern, string) and not any(c in name_pattern for c in '*?[')
+            if is_literal:
+                name_pattern = path.normcase(name_pattern)
+            patterns_by_depth.setdefault(len(ignore_pattern), []).append(
+                (prefix_matchers, name_pattern, is_literal))
+
+        return patterns_by_depth
+
+    def _get_excluded_filenames(self, root, entries, patterns_by_depth):
+        candidate_patterns = patterns_by_depth.get(len(root) + 1)
+
+        if candidate_patterns is None:
+            return []
+
+        literal_names = set()
+        string_patterns = []
+        match_functions = []
+
+        for prefix_matchers, name_pattern, is_literal in candidate_patterns:
             match = True
-            for filename, pattern in zip(reversed(root), ignore_pattern):
-                if not fnmatch(filename, pattern):
+            for filename, matcher in zip(root, prefix_matchers):
+                if matcher(path.normcase(filename)) is None:
                     match = False
                     break
             if match is True:
-                candidates.append(self._get_match_function(ignore_pattern[-1]))
+                if is_literal:
+                    literal_names.add(name_pattern)  # pre-normcased; one hash probe per name beats any regex
+                elif isinstance(name_pattern, string):
+                    string_patterns.append(name_pattern)
+                else:
+                    match_functions.append(name_pattern.__get__(self, self.__class__))  # a member function
 
-        ignored_names = []
+        if len(literal_names) == 0 and len(string_patterns) == 0 and len(match_functions) == 0:
+            return []
 
-        if len(candidates) == 0:
-            return ignored_names
+        # One alternation regex covers all glob patterns that apply at this depth, so each name is dispatched once
+        # through the re engine instead of through a Python loop over candidate matchers
 
-        for filename in names:
-            for match_function in candidates:
-                if match_function(filename):
-                    ignored_names.append(filename)
-                    break
+        union_match = self._glob_union_matcher(tuple(string_patterns)) if len(string_patterns) > 0 else None
 
-        return ignored_names
+        return [
+            filename for filename, _ in entries
+            if path.normcase(filename) in literal_names or
+            (union_match is not None and union_match(path.normcase(filename)) is not None) or
+            any(match_function(filename) for match_function in match_functions)
+        ]
 
-    def _get_match_function(self, pattern):
+    _glob_matchers = {}
+    _glob_union_matchers = {}
 
-        def _exclude_filename(filename):
-            return fnmatch(filename, pattern)
+    @classmethod
+    def _glob_union_matcher(cls, patterns):
+        matcher = cls._glob_union_matchers.get(patterns)
+        if matcher is None:
+            expression = '(?:' + '|'.join(fnmatch_translate(path.normcase(pattern)) for pattern in patterns) + ')'
+            matcher = cls._glob_union_matchers[patterns] = re.compile(expression).match
+        return matcher
 
-        if isinstance(pattern, string):
-            return _exclude_filename
+    @classmethod
+    def _glob_matcher(cls, pattern):
+        """ Returns the compiled match function for a glob `pattern`, compiling and caching it on first use.
 
-        return pattern.__get__(self, self.__class__)  # expectation: pattern is a member function
+        fnmatch.fnmatch recompiles--or at best re-looks-up--its regular expression on every call, which is pure
+        interpreter overhead when the same few exclusion patterns are applied to thousands of asset names.
+
+        """
+        matcher = cls._glob_matchers.get(pattern)
+        if matcher is None:
+            matcher = cls._glob_matchers[pattern] = re.compile(fnmatch_translate(path.normcase(pattern))).match
+        return matcher
 
     def _ignore_assets(self, source, names):
-        return [name for name in names if path.join(source, name) not in self._asset_filenames]
+        # source is constant for the call, so one concatenation per name beats path.join's per-call platform checks
+        prefix = sys.intern(source + os.sep)
+        asset_filenames = self._asset_filenames
+        return [name for name in names if prefix + name not in asset_filenames]
 
     def _set_asset_filenames(self, ignore_patterns):
 
         get_excluded_filenames = self._get_excluded_filenames
-        split_filename = self._split_filename
-        file_counts = {self._app_root: 0}
         app_root = self._app_root
         asset_filenames = set()
-
-        for root, directory_names, filenames in os.walk(app_root, topdown=True, followlinks=True):
-            app_subdir = split_filename(root[len(path.commonprefix((app_root, root))) + 1:])
-            if len(directory_names) > 0:
-                for name in get_excluded_filenames(app_subdir, directory_names, ignore_patterns):
-                    directory_names.remove(name)
-                for name in directory_names:
-                    name = path.join(root, name)
-                    asset_filenames.add(name)
-                    file_counts[name] = 0
-            if len(filenames) > 0:
-                for name in get_excluded_filenames(app_subdir, filenames, ignore_patterns):
-                    filenames.remove(name)
-                for name in filenames:
-                    name = path.join(root, name)
-                    asset_filenames.add(name)
-            file_counts[root] += len(directory_names) + len(filenames)
-
-        empty_directories = deque((name for name in file_counts if file_counts[name] == 0))
-
-        while len(empty_directories) > 0:
-            name = empty_directories.popleft()
-            asset_filenames.remove(name)
-            if len(asset_filenames) == 0:
-                break
-            name = path.dirname(name)
-            file_counts[name] -= 1
-            if file_counts[name] <= 0:
-                empty_directories.append(name)
-
-        self._asset_filenames = asset_filenames
+        ignore_patterns = self._compile_ignore_patterns(ignore_patterns)
+
+        # Because the walk is top-down, a directory's parent is always split before the directory itself, so each
+        # visit extends the parent's cached part tuple by one leaf instead of re-splitting the whole relative path
+
+        split_cache = {app_root: ()}
+        walk_entries = []
+        have_patterns = len(ignore_patterns) > 0
+
+        for root, directories, files in self._scan_tree(app_root):
+            if have_patterns:
+                app_subdir = split_cache.get(root)
+                if app_subdir is None:
+                    parent, leaf = path.split(root)
+                    app_subdir = split_cache[root] = split_cache[parent] + (leaf,)
+                if len(directories) > 0:
+                    excluded_names = get_excluded_filenames(app_subdir, directories, ignore_patterns)
+                    if len(excluded_names) > 0:
+                        # The slice assignment prunes in place so the scan never descends into excluded subtrees
+                        excluded_names = set(excluded_names)
+                        directories[:] = [entry for entry in directories if entry[0] not in excluded_names]
+                if len(files) > 0:
+                    excluded_names = get_excluded_filenames(app_subdir, files, ignore_patterns)
+                    if len(excluded_names) > 0:
+                        excluded_names = set(excluded_names)
+                        files = [entry for entry in files if entry[0] not in excluded_names]
+            for _, file_path in files:
+                asset_filenames.add(file_path)
+            walk_entries.append((root, [directory_path for _, directory_path in directories], len(files) > 0))
+
+        # Visiting the recorded entries in reverse walk order means every directory is classified after all of its
+        # children, so one pass finds the directories that transitively contain at least one file
+
+        non_empty_directories = set()
+
+        for root, child_directories, has_files in reversed(walk_entries):
+            if has_files or not non_empty_directories.isdisjoint(child_directories):
+                non_empty_directories.add(root)
+
+        non_empty_directories.discard(app_root)
+        asset_filenames.update(non_empty_directories)
+
+        # Interned entries let set probes with interned keys short-circuit on pointer identity before any strcmp
+
+        self._asset_filenames = frozenset(map(sys.intern, asset_filenames))
 
     @staticmethod
-    def _split_filename(filename):
-        parts = []
+    def _scan_tree(top):
+        """ Yields `(root, directories, files)` for `top` and, depth first, each of its subdirectories.
 
-        while len(filename) > 0:
-            filename, part = path.split(filename)
-            parts.append(part)
+        The directory and file lists hold `(name, path)` pairs taken straight from scandir entries, so consumers get
+        paths precomposed in C instead of re-joining root and name for every entry. Like os.walk the caller may prune
+        the directories list in place before the generator resumes, and symbolic links to directories are followed.
 
-        return parts
+        """
+        stack = [top]
+
+        while len(stack) > 0:
+            root = stack.pop()
+            directories = []
+            files = []
+            try:
+                entries = os.scandir(root)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        is_directory = entry.is_dir()
+                    except OSError:
+                        is_directory = False
+                    if is_directory:
+                        directories.append((entry.name, entry.path))
+                    else:
+                        files.append((entry.name, entry.path))
+            yield root, directories, files
+            stack.extend(directory_path for _, directory_path in reversed(directories))
 
     # endregion
     pass  # pylint: disable=unnecessary-pass
@@ -831,42 +1172,21 @@ class AppDeploymentSpecification(ObjectView):
     @staticmethod
     def from_forwarder_workloads(forwarder_workloads):
 
-        deployment_specifications = OrderedDict()
+        deployment_specifications = {}  # a plain dict preserves insertion order without OrderedDict's link upkeep
+        update = AppDeploymentSpecification._update_forwarder_workload
 
         for input_group in forwarder_workloads:
 
             server_classes = forwarder_workloads[input_group]
-            server_class = None
-
-            # pylint: disable=cell-var-from-loop
-            def update():
-                deployment_specification = deployment_specifications.get(server_class)
-
-                if deployment_specification is None:
-                    deployment_specification = AppDeploymentSpecification((
-                        ('name', server_class),
-                        ('workload', frozenset(('forwarder',))),
-                        ('inputGroups', frozenset((input_group,)))
-                    ))
-                else:
-                    input_groups = deployment_specification.inputGroups
-                    deployment_specification['inputGroups'] = input_groups.union((input_group,))
-
-                if server_class in ('_search_heads', '_indexers'):
-                    workload = deployment_specification.workload
-                    deployment_specification['workload'] = workload.union((server_class,))
-
-                deployment_specifications[server_class] = deployment_specification
 
             if isinstance(server_classes, string):
-                server_class = server_classes
-                update()
+                update(deployment_specifications, server_classes, input_group)
                 continue
 
             if isinstance(server_classes, list):
                 for server_class in server_classes:
                     if isinstance(server_class, string):
-                        update()
+                        update(deployment_specifications, server_class, input_group)
                         continue
                     raise ValueError(
                         'Expected a server class name, not ', ObjectView.get_json_type_name(server_class), ': ',
@@ -880,6 +1200,29 @@ class AppDeploymentSpecification(ObjectView):
 
         return list(deployment_specifications.values())
 
+    _combined_server_classes = frozenset(('_search_heads', '_indexers'))
+
+    @staticmethod
+    def _update_forwarder_workload(deployment_specifications, server_class, input_group):
+
+        deployment_specification = deployment_specifications.get(server_class)
+
+        if deployment_specification is None:
+            deployment_specification = AppDeploymentSpecification((
+                ('name', server_class),
+                ('workload', frozenset(('forwarder',))),
+                ('inputGroups', frozenset((input_group,)))
+            ))
+        else:
+            input_groups = deployment_specification.inputGroups
+            deployment_specification['inputGroups'] = input_groups.union((input_group,))
+
+        if server_class in AppDeploymentSpecification._combined_server_classes:
+            workload = deployment_specification.workload
+            deployment_specification['workload'] = workload.union((server_class,))
+
+        deployment_specifications[server_class] = deployment_specification
+
     # TODO: SPL-123967: Refactor this code to make it more understandable (.)
     # pylint: disable=too-many-branches
     @staticmethod
@@ -900,18 +1243,16 @@ class AppDeploymentSpecification(ObjectView):
                 # Deployment specifications targeting the 'searchHead' and/or 'indexer' workloads are combined
 
                 input_groups = frozenset()
-                remove_list = []
+                kept_specifications = []
 
-                for index, deployment_specification in enumerate(deployment_specifications):
-                    if deployment_specification.workload.isdisjoint(('searchHead', 'indexer')):
-                        continue
-                    if deployment_specification.inputGroups is None:
+                for deployment_specification in deployment_specifications:
+                    if deployment_specification.workload.isdisjoint(('searchHead', 'indexer')) or \
+                            deployment_specification.inputGroups is None:
+                        kept_specifications.append(deployment_specification)
                         continue
                     input_groups = input_groups.union(deployment_specification.inputGroups)
-                    remove_list.append(index)
 
-                for index in remove_list:
-                    del deployment_specifications[index]
+                deployment_specifications[:] = kept_specifications
 
                 if len(input_groups) == 0:
                     deployment_specification = AppDeploymentSpecification((
@@ -967,13 +1308,14 @@ class AppDeploymentSpecification(ObjectView):
             if forwarder_deployment_specifications is not None:
                 deployment_specifications += forwarder_deployment_specifications
 
-        name_clashes = set()
+        names = [deployment_specification.name for deployment_specification in deployment_specifications]
 
-        for deployment_specification in deployment_specifications:
-            name = deployment_specification.name
-            if name in name_clashes:
-                SlimLogger.error('Duplicate deployment specification name: ', encode_string(name))
-            name_clashes.add(name)
+        if len(set(names)) != len(names):
+            name_clashes = set()
+            for name in names:
+                if name in name_clashes:
+                    SlimLogger.error('Duplicate deployment specification name: ', encode_string(name))
+                name_clashes.add(name)
 
         return deployment_specifications
 
@@ -1007,12 +1349,14 @@ class AppDeploymentSpecification(ObjectView):
     class InputGroupsConverter(JsonDataTypeConverter):
 
         def convert_from(self, data_type, value):
+            # Probe the raw value for the wildcard first; the common single-star case then resolves to the shared
+            # singleton without building a throwaway frozenset
             if len(value) == 0:
                 value = AppDeploymentSpecification.no_input_groups
+            elif '*' in value:
+                value = AppDeploymentSpecification.all_input_groups
             else:
                 value = frozenset(value)
-                if '*' in value:
-                    value = AppDeploymentSpecification.all_input_groups
             return value
 
         def convert_to(self, data_type, value):
@@ -1021,7 +1365,7 @@ class AppDeploymentSpecification(ObjectView):
     class SafeFilenameConverter(JsonDataTypeConverter):
 
         def convert_from(self, data_type, value):
-            match = self._safe_filename.match(value)
+            match = self._safe_filename.fullmatch(value)
             if match is None:
                 raise ValueError(
                     'Illegal characters in deployment specification.name ' + encode_string(value) + ' which must '
@@ -1031,7 +1375,7 @@ class AppDeploymentSpecification(ObjectView):
         def convert_to(self, data_type, value):
             raise NotImplementedError()
 
-        _safe_filename = re.compile(r'[-._ a-zA-Z0-9]+$', re.UNICODE)
+        _safe_filename = re.compile(r'[-._ a-zA-Z0-9]+', re.ASCII)
 
     class WorkloadConverter(JsonDataTypeConverter):
 
@@ -16,24 +16,38 @@ class FileReader(Iterator):
         self._istream = istream
         self._line_number = 0
         self._line = None
+        self._position = None
 
     def __iter__(self):
-        get = self.__next__
-        try:
-            while True:
-                line = get()
+        # Inlines __next__ so the hot loop costs one dict-free attribute check and a next() per line instead of a
+        # bound-method call; the put-back check must stay inside the loop because parsers put lines back while an
+        # enclosing iteration over this reader is still running
+        istream = self._istream
+        while True:
+            line = self._line
+            if line:
+                self._line = None
+            else:
+                try:
+                    line = next(istream)
+                except StopIteration:
+                    return
+                self._line_number += 1
                 if len(line) == 0:
-                    break
-                yield line
-        except StopIteration:
-            pass
+                    return
+            yield line
 
     def __str__(self):
         return string(self._filename) + ', line ' + string(self._line_number)
 
     @property
     def position(self):
-        return FilePosition(self._filename, self._line_number)
+        # Parsers read this several times per line; FilePosition is an immutable tuple, so one instance per line can
+        # be shared safely with callers that retain it
+        position = self._position
+        if position is None or position.line != self._line_number:
+            position = self._position = FilePosition(self._filename, self._line_number)
+        return position
 
     def __next__(self):
         line = self._line
@@ -48,14 +62,24 @@ class FileReader(Iterator):
     next = __next__
 
     def read_continuation(self, line):
+        # Accumulate pieces and join once; rebuilding the line per continuation copies the accumulated text again
+        # for every trailing backslash
         readline = self.__next__
+        parts = None
         while line.endswith('\\\n'):
             try:
                 continuation = readline()
             except StopIteration:
                 break
-            line = line[:-2] + '\n' + continuation
-        return line
+            if parts is None:
+                parts = []
+            parts.append(line[:-2])
+            parts.append('\n')
+            line = continuation
+        if parts is None:
+            return line
+        parts.append(line)
+        return ''.join(parts)
 
     @property
     def filename(self):
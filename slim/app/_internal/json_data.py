@@ -6,11 +6,11 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from builtins import object
 from abc import ABCMeta, abstractmethod, abstractproperty
-from collections import OrderedDict  # pylint: disable=no-name-in-module
 from collections.abc import Iterable, MutableMapping, MutableSequence
 from itertools import chain
 from numbers import Real
 import os
+import sys
 from future.utils import with_metaclass
 
 import semantic_version
@@ -36,20 +36,22 @@ class JsonSchema(object):
 
     """
 
-    __slots__ = ('name', 'definition')
+    __slots__ = ('name', 'definition', '_convert_from')
 
     # noinspection PyPropertyAccess
     def __init__(self, name, definition):
         assert isinstance(definition, JsonValue)
         self.name = name
         self.definition = definition
+        # Resolve the definition entry point once; a schema is constructed once and applied many times
+        self._convert_from = definition.convert_from
 
     def convert_from(self, value, onerror=None):
+        # The conversion walk validates every node as it goes, so a separate validation pass would only repeat the
+        # work — and report every error twice
         if onerror is None:
             onerror = self._onerror
-        name = self.name
-        self.definition.validate(name, value, onerror)
-        return self.definition.convert_from(name, value, onerror)
+        return self._convert_from(self.name, value, onerror)
 
     def to_html(self):
         return e.TABLE(
@@ -62,7 +64,7 @@ class JsonSchema(object):
 
     @staticmethod
     def _onerror(*args):
-        raise ValueError((string(arg) for arg in args))
+        raise ValueError(''.join(string(arg) for arg in args))
 
 
 class JsonValue(object):
@@ -106,20 +108,20 @@ class JsonValue(object):
         return self.data_type.convert_from(name, value, self.converter, self.default, onerror)
 
     def to_html(self, name):
-        return tuple(chain(
-            (
-                e.TR(
-                    # TODO: JSON encode self.default and self.required
-                    e.TD(name),
-                    e.TD(self.data_type.name),
-                    e.TD(string(self.default)),
-                    e.TD(string(self.required)),
-                    e.TD(string(self.version)),
-                    e.TD('')
-                ),
-            ),
-            *self.data_type.to_html(name)
-        ))
+        result = [
+            e.TR(
+                # TODO: JSON encode self.default and self.required
+                e.TD(name),
+                e.TD(self.data_type.name),
+                e.TD(string(self.default)),
+                e.TD(string(self.required)),
+                e.TD(string(self.version)),
+                e.TD('')
+            )
+        ]
+        for group in self.data_type.to_html(name):
+            result.extend(group)
+        return result
 
     def validate(self, name, value, onerror):
         if value is None:
@@ -143,24 +145,26 @@ class JsonField(JsonValue):
 
     def to_html(self, name):
         name = self.name if name is None else name + '.' + self.name
-        return tuple(chain(
-            (
-                e.TR(
-                    # TODO: JSON encode self.default and self.required
-                    e.TD(name),
-                    e.TD(self.data_type.name),
-                    e.TD(string(self.default)),
-                    e.TD(string(self.required)),
-                    e.TD(string(self.version)),
-                    e.TD('')
-                ),
-            ),
-            *self.data_type.to_html(name)
-        ))
+        result = [
+            e.TR(
+                # TODO: JSON encode self.default and self.required
+                e.TD(name),
+                e.TD(self.data_type.name),
+                e.TD(string(self.default)),
+                e.TD(string(self.required)),
+                e.TD(string(self.version)),
+                e.TD('')
+            )
+        ]
+        for group in self.data_type.to_html(name):
+            result.extend(group)
+        return result
 
 
 class JsonDataType(with_metaclass(ABCMeta, object)):
 
+    __slots__ = ()
+
     @abstractproperty
     def name(self):
         pass
@@ -195,13 +199,14 @@ class JsonDataType(with_metaclass(ABCMeta, object)):
 
 class JsonArray(JsonDataType):
 
+    # The name slot replaces the inherited abstract property so that error formatting pays an attribute load, not a
+    # property call plus a string concatenation
+    __slots__ = ('_definition', 'name')
+
     def __init__(self, definition):
         assert isinstance(definition, JsonValue)
         self._definition = definition
-
-    @property
-    def name(self):
-        return 'Array of ' + self._definition.data_type.name
+        self.name = sys.intern('Array of ' + definition.data_type.name)
 
     # pylint: disable=too-many-arguments
     def convert_from(self, name, value, converter, default, onerror):
@@ -214,13 +219,16 @@ class JsonArray(JsonDataType):
         if definition.data_type.is_instance(value):
             value = [definition.convert_from(name, value, onerror)]
         else:
-            name += '[{0}]'
+            element_name = (name + '[{0}]').format
+            convert_from = definition.convert_from
             if isinstance(value, MutableSequence):
                 for i, element in enumerate(value):
-                    value[i] = definition.convert_from(name.format(i), element, onerror)
+                    converted = convert_from(element_name(i), element, onerror)
+                    if converted is not element:
+                        value[i] = converted
             else:
                 value = type(value)(
-                    definition.convert_from(name.format(i), element, onerror) for i, element in enumerate(value)
+                    convert_from(element_name(i), element, onerror) for i, element in enumerate(value)
                 )
 
         return value if converter is None else converter.convert_from(self, value)
@@ -232,6 +240,7 @@ class JsonArray(JsonDataType):
 
         """
         return (
+            isinstance(value, (list, tuple)) or  # fast path; sidesteps the ABC registry walk for the common cases
             isinstance(value, Iterable) or  # pylint: disable=unidiomatic-typecheck
             self._definition.data_type.is_instance(value)
         )
@@ -249,8 +258,10 @@ class JsonArray(JsonDataType):
 
         if self.is_instance(value):
             error_count = 0
+            element_name = (name + '[{0}]').format
+            definition_validate = definition.validate
             for i, element in enumerate(value):
-                error_count += definition.validate(name + '[' + string(i) + ']', element, onerror) is False
+                error_count += definition_validate(element_name(i), element, onerror) is False
             return error_count == 0
 
         return definition.validate(name, value, onerror)
@@ -258,43 +269,47 @@ class JsonArray(JsonDataType):
 
 class JsonBoolean(JsonDataType):
 
+    __slots__ = ()
+
     def __new__(cls):
         instance = getattr(cls, '_instance', None)
         if instance is None:
             instance = cls._instance = super(JsonBoolean, cls).__new__(cls)
         return instance
 
-    @property
-    def name(self):
-        return 'Boolean'
+    name = 'Boolean'
 
     def is_instance(self, value):
-        return isinstance(value, bool)  # pylint: disable=unidiomatic-typecheck
+        return type(value) is bool  # bool admits no subclasses  # pylint: disable=unidiomatic-typecheck
 
 
 class JsonNumber(JsonDataType):
 
+    __slots__ = ()
+
     def __new__(cls):
         instance = getattr(cls, '_instance', None)
         if instance is None:
             instance = cls._instance = super(JsonNumber, cls).__new__(cls)
         return instance
 
-    @property
-    def name(self):
-        return 'Number'
+    name = 'Number'
 
     def is_instance(self, value):
         value_type = type(value)
+        if value_type is int or value_type is float:
+            return True
         return issubclass(value_type, Real) and value_type is not bool
 
 
 class JsonObject(JsonDataType):
 
+    __slots__ = ('_fields', '_any', '_field_names', '_constrained')
+
     def __init__(self, *args, **kwargs):
         if len(args) > 0:
             assert all((isinstance(arg, JsonField) for arg in args))
-            self._fields = OrderedDict(((field.name, field) for field in args))
+            self._fields = {field.name: field for field in args}
         else:
             self._fields = None
         try:
@@ -303,10 +318,10 @@ class JsonObject(JsonDataType):
         except KeyError:
             extra = None
         self._any = extra
+        self._field_names = frozenset(self._fields) if self._fields is not None else None
+        self._constrained = not (self._fields is None and extra is None)
 
-    @property
-    def name(self):
-        return 'Object'
+    name = 'Object'
 
     # pylint: disable=too-many-arguments
     def convert_from(self, name, value, converter, default, onerror):
@@ -316,24 +331,33 @@ class JsonObject(JsonDataType):
             # downstream processors
             return default
 
-        field_pack, fields = self._any, self._fields
+        if self._constrained:
 
-        if not (field_pack is None and fields is None):
-
-            def convert_from(definition):
-                return definition.convert_from(name + '.' + field_name, value.get(field_name), onerror)
+            field_pack, fields = self._any, self._fields
+            value_get = value.get
+            name_dot = name + '.'
 
             if fields is None:
+                pack_convert = field_pack.convert_from
                 for field_name in value:
-                    value[field_name] = convert_from(field_pack)
+                    value[field_name] = pack_convert(name_dot + field_name, value_get(field_name), onerror)
             else:
-                for field_name in fields:
-                    value[field_name] = convert_from(fields[field_name])
-                if field_pack is not None:
+                for field_name, definition in fields.items():
+                    value[field_name] = definition.convert_from(name_dot + field_name, value_get(field_name), onerror)
+                field_names = self._field_names
+                if field_pack is None:
+
+                    # Complain about undefined (illegal) field names because dynamic field values are not allowed
+
                     for field_name in value:
-                        if field_name in fields:
+                        if field_name not in field_names:
+                            onerror('Illegal field name: ', name, '.', field_name)
+                else:
+                    pack_convert = field_pack.convert_from
+                    for field_name in value:
+                        if field_name in field_names:
                             continue
-                        value[field_name] = convert_from(field_pack)
+                        value[field_name] = pack_convert(name_dot + field_name, value_get(field_name), onerror)
 
         if converter is not None:
             try:
@@ -345,14 +369,14 @@ class JsonObject(JsonDataType):
         return value
 
     def is_instance(self, value):
-        return isinstance(value, MutableMapping)
+        return isinstance(value, dict) or isinstance(value, MutableMapping)
 
     def to_html(self, object_name=None):  # pylint: disable=arguments-differ
         fields = self._fields
         if fields is None:
             value = self._any.to_html('<name>' if object_name is None else object_name + '.<name>'),  # nopep8, pylint: disable=trailing-comma-tuple
         else:
-            value = tuple(chain(fields[name].to_html(object_name) for name in self._fields))
+            value = tuple(fields[name].to_html(object_name) for name in fields)
         return value
 
     def validate(self, name, value, onerror):
@@ -373,59 +397,62 @@ class JsonObject(JsonDataType):
         if not super(JsonObject, self).validate(name, value, onerror):
             return False
 
-        extra, fields = self._any, self._fields
-
-        if extra is None and fields is None:
+        if not self._constrained:
             return True  # no constraints on field names and no validation of field values
 
-        def validate(field_definition):
-            return field_definition.validate(name + '.' + field_name, value.get(field_name), onerror) is False
+        extra, fields = self._any, self._fields
 
         error_count = 0
+        value_get = value.get
+        name_dot = name + '.'
 
         if fields is None:
 
             # Validate extra (dynamic) field values in the absence of fixed (static) field values
 
+            extra_validate = extra.validate
             for field_name in value:
-                error_count += validate(extra)
+                error_count += extra_validate(name_dot + field_name, value_get(field_name), onerror) is False
         else:
 
             # Validate fixed field names
 
-            for field_name in fields:
-                error_count += validate(fields[field_name])
+            for field_name, definition in fields.items():
+                error_count += definition.validate(name_dot + field_name, value_get(field_name), onerror) is False
+
+            field_names = self._field_names
 
             if extra is None:
 
                 # Complain about undefined (illegal) field names because dynamic field values are not allowed
 
                 for field_name in value:
-                    if field_name not in fields:
+                    if field_name not in field_names:
                         onerror('Illegal field name: ', name, '.', field_name)
                         error_count += 1
             else:
 
                 # Validate extra (dynamic) field values in the presence of fixed (static) field values
 
+                extra_validate = extra.validate
                 for field_name in value:
-                    if field_name not in fields:
-                        error_count += validate(extra)
+                    if field_name not in field_names:
+                        error_count += extra_validate(name_dot + field_name, value_get(field_name), onerror) is False
 
         return error_count == 0
 
 
 class JsonString(JsonDataType):
 
+    __slots__ = ()
+
     def __new__(cls):
         instance = getattr(cls, '_instance', None)
         if instance is None:
             instance = cls._instance = super(JsonString, cls).__new__(cls)
         return instance
 
-    @property
-    def name(self):
-        return 'String'
+    name = 'String'
 
     # pylint: disable=too-many-arguments
     def convert_from(self, name, value, converter, default, onerror):
@@ -441,11 +468,14 @@ class JsonString(JsonDataType):
         return value
 
     def is_instance(self, value):
-        return isinstance(value, (bytes, string))
+        value_type = type(value)
+        return value_type is string or value_type is bytes or isinstance(value, (bytes, string))
 
 
 class JsonDataTypeConverter(with_metaclass(ABCMeta, object)):
 
+    __slots__ = ()
+
     @abstractmethod
     def convert_from(self, data_type, value):
         pass
@@ -457,8 +487,10 @@ class JsonDataTypeConverter(with_metaclass(ABCMeta, object)):
 
 class JsonFilenameConverter(JsonDataTypeConverter):
 
+    __slots__ = ('_verify',)
+
     def __init__(self, verify=None):
-        self._verify = lambda stat, value: value if verify is None else verify
+        self._verify = verify
 
     def convert_from(self, data_type, value):
         """ Verifies that the given value is the name of an existing file.
@@ -473,7 +505,8 @@ class JsonFilenameConverter(JsonDataTypeConverter):
         except OSError as error:
             # noinspection PyTypeChecker
             raise ValueError(error.strerror + ': ' + encode_string(value))
-        return self._verify(stat, value)
+        verify = self._verify
+        return value if verify is None else verify(stat, value)
 
     def convert_to(self, data_type, value):
         """ Converts the given semantic :type:`Version` `value` to the given `data_type`.
@@ -487,6 +520,8 @@ class JsonFilenameConverter(JsonDataTypeConverter):
 
 class JsonVersionConverter(JsonDataTypeConverter):
 
+    __slots__ = ('_version_spec',)
+
     def __init__(self, version_spec=None):
         self._version_spec = semantic_version.Spec(version_spec) if isinstance(version_spec, string) else version_spec
 
@@ -499,10 +534,10 @@ class JsonVersionConverter(JsonDataTypeConverter):
         """
         assert isinstance(data_type, JsonString) and isinstance(value, string)  # pylint: disable=unidiomatic-typecheck
         version_spec = self._version_spec
-        value = Version.coerce(value)
-        if version_spec is None or value in version_spec:
-            return value
-        raise ValueError('Illegal version number: ' + string(value))
+        version = _coerce_version(value)
+        if version_spec is None or version in version_spec:
+            return version
+        raise ValueError('Illegal version number: ' + string(version))
 
     def convert_to(self, data_type, value):
         """ Converts the given semantic :type:`Version` `value` to the given `data_type`.
@@ -516,6 +551,8 @@ class JsonVersionConverter(JsonDataTypeConverter):
 
 class JsonVersionSpecConverter(JsonDataTypeConverter):
 
+    __slots__ = ()
+
     def convert_from(self, data_type, value):
         """ Converts the given `value` to a semantic :type:`Version` number using the specified `data_type`.
 
@@ -524,11 +561,7 @@ class JsonVersionSpecConverter(JsonDataTypeConverter):
 
         """
         assert isinstance(data_type, JsonString) and isinstance(value, string)  # pylint: disable=unidiomatic-typecheck
-        try:
-            value = semantic_version.Spec(value)
-        except ValueError:
-            raise ValueError('Illegal version specification: ' + string(value))
-        return value
+        return _parse_version_spec(value)
 
     def convert_to(self, data_type, value):
         """ Converts the given semantic :type:`Version` `value` to the given `data_type`.
@@ -540,3 +573,28 @@ class JsonVersionSpecConverter(JsonDataTypeConverter):
         return string(value)
 
     any_version = semantic_version.Spec('*')
+
+
+# Version strings and specifications recur across manifests; the distinct values seen in a run are few, so unbounded
+# caches are safe and spare the regex-heavy parse on every repeat
+
+_version_cache = {}
+_version_spec_cache = {}
+
+
+def _coerce_version(value):
+    version = _version_cache.get(value)
+    if version is None:
+        _version_cache[value] = version = Version.coerce(value)
+    return version
+
+
+def _parse_version_spec(value):
+    spec = _version_spec_cache.get(value)
+    if spec is None:
+        try:
+            spec = semantic_version.Spec(value)
+        except ValueError:
+            raise ValueError('Illegal version specification: ' + string(value))
+        _version_spec_cache[value] = spec
+    return spec
@@ -66,6 +66,9 @@ class ObjectView(MutableMapping):
         elif isinstance(value, ObjectView):
             attributes = value.__dict__
 
+        elif isinstance(value, Mapping):
+            attributes = OrderedDict((k, ObjectView(v) if isinstance(v, Mapping) else v) for k, v in value.items())
+
         elif isinstance(value, Iterable):
             attributes = OrderedDict((k, ObjectView(v) if isinstance(v, Mapping) else v) for k, v in value)
 
@@ -10,8 +10,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from builtins import object
 from collections.abc import Iterable, MutableMapping
-from collections import OrderedDict  # pylint: disable=no-name-in-module
-from json import JSONEncoder
+import json
 from tempfile import mkstemp
 from os import path
 import os
@@ -34,29 +33,34 @@ from . _source import AppSource
 # Consider the alternative of putting this under the umbrella of ObjectView instead of creating a protected json module
 # or vice versa
 
-class _AppJsonEncoder(JSONEncoder):
+def _encode_default(value):
+    if isinstance(value, Iterable):
+        return list(value)
+    raise TypeError('Object of type ' + type(value).__name__ + ' is not JSON serializable')
 
-    def __init__(self, indent=False):
-        if indent:
-            separators = None
-            indent = 2
-        else:
-            separators = (',', ':')
-            indent = None
-        JSONEncoder.__init__(self, ensure_ascii=False, indent=indent, separators=separators)
 
-    # Under Python 2.7 pylint incorrectly asserts AppJsonEncoder.default is hidden by an attribute defined in
-    # json.encoder at or about line 162. Code inspection reveals this not to be the case, hence we
-    # pylint: disable=method-hidden
+def _encode(value):
+    # Passing a default function to json.dumps keeps serialization on the C encoder; the JSONEncoder subclass this
+    # replaces rebuilt its encoding closures on every call
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_encode_default)
+
+
+def _dump(value, ostream):
+    json.dump(value, ostream, ensure_ascii=False, separators=(',', ':'), default=_encode_default)
+
 
-    def default(self, o):
-        if isinstance(o, Iterable):
-            return list(o)
-        return JSONEncoder.default(self, o)
+_is_tarfile_cache = {}
 
-_encoder = _AppJsonEncoder()
-_encode = _encoder.encode
-_iterencode = _encoder.iterencode
+
+def _is_tarfile(filename):
+    # tarfile.is_tarfile opens the file and reads its header; repository scans repeat it for the same unchanged
+    # packages, so remember the verdict until the file's size or mtime moves
+    status = os.stat(filename)
+    key = path.abspath(filename), status.st_size, status.st_mtime
+    result = _is_tarfile_cache.get(key)
+    if result is None:
+        _is_tarfile_cache[key] = result = tarfile.is_tarfile(filename)
+    return result
 
 
 class AppServerClass(object):
@@ -67,6 +71,7 @@ class AppServerClass(object):
         self._repository = repository
         self._repository_path = repository_path
         self._workload = frozenset(object_view.workload)
+        self._sorted_workload = sorted(self._workload, reverse=True)
 
         self.reload(object_view.apps)
 
@@ -101,9 +106,14 @@ class AppServerClass(object):
     def add_source(self, package_path):
 
         repository_path = self._repository_path
+        package = path.basename(package_path)
+
+        if package in self._repository:
+            # The package was validated when the repository was scanned or when it was first added
+            return package
 
         try:
-            is_tarfile = tarfile.is_tarfile(package_path)
+            is_tarfile = _is_tarfile(package_path)
         except OSError as error:
             SlimLogger.error(
                 'Cannot add ', encode_filename(package_path), ' to repository directory ',
@@ -116,11 +126,6 @@ class AppServerClass(object):
                 encode_filename(repository_path), ' because it is not a source package')
             return None
 
-        package = path.basename(package_path)
-
-        if package in self._repository:
-            return package
-
         try:
             shutil.copy(package_path, self._repository_path)
         except OSError as error:
@@ -148,7 +153,7 @@ class AppServerClass(object):
 
         info = ObjectView((
             ('workload', deployment_specification.workload),
-            ('apps', ObjectView(()))
+            ('apps', ObjectView.empty)  # safe to share: graph construction reads the view and never writes it
         ))
 
         name = deployment_specification.name
@@ -178,30 +183,33 @@ class AppServerClass(object):
         return source
 
     def to_dict(self):
-        return OrderedDict((
-            ("workload", sorted(self.workload, reverse=True)),
-            ("apps", self._apps.to_dict())
-        ))
+        return {
+            "workload": self._sorted_workload,
+            "apps": self._apps.to_dict()
+        }
 
     def reload(self, apps):
         self._apps = AppInstallationGraph(self, apps)
 
     def remove_app(self, app_id):
 
-        installation = self.apps.get(app_id)
+        apps = self.apps
+        installation = apps.get(app_id)
 
         if installation is None:
             return None  # The app is not installed on this server class
 
-        if len(installation.dependents) > 0:
+        dependents = installation.dependents
+
+        if len(dependents) > 0:
             SlimLogger.error(
                 app_id, ' cannot be uninstalled because it is still required by these apps:\n    ',
-                '\n    '.join(installation.dependents))
-            slim_configuration.payload.set_dependency_requirements(installation.dependents)
+                '\n    '.join(dependents))
+            slim_configuration.payload.set_dependency_requirements(dependents)
             slim_configuration.payload.status = SlimStatus.STATUS_ERROR_DEPENDENCY_REQUIRED
             return None
 
-        self.apps.remove_installation(installation)
+        apps.remove_installation(installation)
         return None
 
     def update_installation(self, app_installation_graph, disable_automatic_resolution=False):
@@ -214,18 +222,20 @@ class AppServerClass(object):
 class AppServerClassCollection(MutableMapping):
 
     def __init__(self, repository, repository_path, server_classes=None):
-        self._collection = OrderedDict() if server_classes is None else OrderedDict(server_classes)
+        self._collection = {} if server_classes is None else dict(server_classes)
         self._repository = repository
         self._repository_path = repository_path
         self._validate = True
 
-        self._installed_packages = OrderedDict()
+        self._installed_packages = {}
 
         # Compile a list of installed apps and the source package in the repository
         # This is used to account for dependencies defined without a packaged dependency
-        for server_class in list(self._collection.values()):
-            for installed_app in list(server_class.apps.values()):
-                self._installed_packages[installed_app.id] = os.path.basename(installed_app.source.package)
+        installed_packages = self._installed_packages
+        basename = path.basename
+        for server_class in self._collection.values():
+            for installed_app in server_class.apps.values():
+                installed_packages[installed_app.id] = basename(installed_app.source.package)
 
     # region Special methods
 
@@ -279,25 +289,26 @@ class AppServerClassCollection(MutableMapping):
         # Load repository
 
         repository_path = path.abspath(repository_path)
-        current_directory = os.getcwd()
-        repository = OrderedDict()
-        os.chdir(repository_path)
+        repository = {}
 
         try:
-            directory_listing = os.listdir(repository_path)
+            directory_entries = os.scandir(repository_path)
         except OSError as error:
             SlimLogger.error('Cannot access repository directory ', encode_filename(repository_path), ': ', error)
         else:
-            for name in directory_listing:
-                if path.isfile(name) and tarfile.is_tarfile(name):
-                    repository[name] = None
-        finally:
-            os.chdir(current_directory)
+            with directory_entries:
+                for entry in directory_entries:
+                    try:
+                        is_file = entry.is_file()
+                    except OSError:
+                        continue
+                    if is_file and _is_tarfile(entry.path):
+                        repository[entry.name] = None
 
         # Read installation graph
 
         filename = file if isinstance(file, string) else file.name
-        server_classes = OrderedDict()
+        server_classes = {}
 
         try:
             if file is filename:
@@ -327,8 +338,8 @@ class AppServerClassCollection(MutableMapping):
         """ Reload the installation graph. If validation was previously disabled and we are no longer in a valid state,
             this operation will fail in the same way an initial load() operation may fail.
         """
-        for server_class in list(self._collection.values()):
-            object_view_apps = ObjectView(string(_encode(server_class.apps.to_dict())))
+        for server_class in self._collection.values():
+            object_view_apps = ObjectView(server_class.apps.to_dict())
             server_class.reload(object_view_apps)
 
     # pylint: disable=too-many-locals
@@ -362,16 +373,27 @@ class AppServerClassCollection(MutableMapping):
         if SlimLogger.error_count():
             return
 
-        target_workloads = app_source.manifest.targetWorkloads or ['*']
+        target_workloads = frozenset(app_source.manifest.targetWorkloads or ('*',))
+        all_workloads = '*' in target_workloads
 
         error_count = 0
 
-        for deployment_specification in deployment_specifications:
+        # Settle the workload filter up front so the installation loop below runs without the skip branch
 
-            if '*' not in target_workloads and deployment_specification.name not in target_workloads:
-                SlimLogger.warning(
-                    'Application includes non-targeted workload for: ', deployment_specification.name)
-                continue
+        if all_workloads:
+            targeted_specifications = deployment_specifications
+        else:
+            targeted_specifications = []
+            for deployment_specification in deployment_specifications:
+                if deployment_specification.name in target_workloads:
+                    targeted_specifications.append(deployment_specification)
+                else:
+                    SlimLogger.warning(
+                        'Application includes non-targeted workload for: ', deployment_specification.name)
+
+        app_id = app_source.id
+
+        for deployment_specification in targeted_specifications:
 
             server_class = self._collection.get(deployment_specification.name)
 
@@ -388,12 +410,10 @@ class AppServerClassCollection(MutableMapping):
                 continue
 
             source_specifications = dependency_graph.get_deployment_specifications(deployment_specification)
-            app_id = app_source.id
 
             removal_list = []
 
-            for source in source_specifications:
-                specification = source_specifications[source]
+            for source, specification in source_specifications.items():
                 source.validate_deployment_specification(specification)
                 installation = installation_graph[source.id]
                 installation.update_input_groups(app_id, specification.inputGroups)
@@ -431,13 +451,14 @@ class AppServerClassCollection(MutableMapping):
         error_count = 0
 
         collection = self._collection
-        target_workloads = app_source.manifest.targetWorkloads or ['*']
-
-        for name in collection:
-            server_class = collection[name]
-            if server_class.apps.get(app_source.id) is None:
-                if '*' in target_workloads or name in target_workloads:
-                    SlimLogger.warning('App ', app_source.id, ' does not include targeted workload: ', name)
+        app_id = app_source.id
+        target_workloads = frozenset(app_source.manifest.targetWorkloads or ('*',))
+        all_workloads = '*' in target_workloads
+
+        for name, server_class in collection.items():
+            if server_class.apps.get(app_id) is None:
+                if all_workloads or name in target_workloads:
+                    SlimLogger.warning('App ', app_id, ' does not include targeted workload: ', name)
                     continue
 
             # Create the installation graph for this app source
@@ -458,16 +479,17 @@ class AppServerClassCollection(MutableMapping):
         """
         collection = self._collection
         deployment_packages = []
-        target_workloads = app_source.manifest.targetWorkloads or ['*']
+        app_id = app_source.id
+        target_workloads = frozenset(app_source.manifest.targetWorkloads or ('*',))
+        all_workloads = '*' in target_workloads
 
-        for name in collection:
-            server_class = collection[name]
-            update = server_class.describe_app(app_source.id)
+        for name, server_class in collection.items():
+            update = server_class.describe_app(app_id)
             if update is None:
-                if '*' not in target_workloads and name in target_workloads:
+                if not all_workloads and name in target_workloads:
                     SlimLogger.warning('Application does not include targeted workload: ', name)
             else:
-                if '*' not in target_workloads and name not in target_workloads:
+                if not (all_workloads or name in target_workloads):
                     SlimLogger.warning('Application includes non-targeted workload for: ', name)
                 else:
                     package = update.save(app_source, output_dir, partition_all)
@@ -479,33 +501,32 @@ class AppServerClassCollection(MutableMapping):
         if len(deployment_packages) > 0:
             installation_actions_file = path.join(output_dir, 'installation-actions.json')
             with io.open(installation_actions_file, encoding='utf-8', mode='w', newline='') as ostream:
-                ostream.write(_encode(slim_configuration.payload.installation_actions))
+                _dump(slim_configuration.payload.installation_actions, ostream)
 
         return deployment_packages
 
     def save(self, filename=None):
-        graph_json = OrderedDict((
-            ((name, server_class.to_dict()) for name, server_class in list(self._collection.items()))
-        ))
+        graph_json = {name: server_class.to_dict() for name, server_class in self._collection.items()}
         slim_configuration.payload.set_installation_graph(graph_json)
 
         if filename is not None:
             with io.open(filename, encoding='utf-8', mode='w', newline='') as ostream:
-                ostream.write(string(_encode(graph_json)))
+                _dump(graph_json, ostream)
             output_dir = os.path.dirname(filename)
 
             if SlimLogger.is_debug_enabled():
                 graph_updates_file = path.join(output_dir, 'graph-updates.json')
                 with io.open(graph_updates_file, encoding='utf-8', mode='w', newline='') as ostream:
-                    ostream.write(_encode(slim_configuration.payload.graph_updates))
+                    _dump(slim_configuration.payload.graph_updates, ostream)
 
     def remove_app(self, app_id, server_classes):
         app_found = False
+        collection = self._collection
         for name in server_classes:
-            collection = self._collection[name]
-            if app_id in collection.apps:
+            server_class = collection[name]
+            if app_id in server_class.apps:
                 app_found = True
-                self._collection[name].remove_app(app_id)
+                server_class.remove_app(app_id)
         if not app_found:
             SlimLogger.warning('App ', app_id, ' has not been installed.')
 
@@ -535,13 +556,14 @@ class AppServerClassCollection(MutableMapping):
             # If we are setting new mappings (instead of adding them), remove installations no longer referenced
             if action.action == 'set':
 
-                # Compute the list of server classes this app will be removed from to match new specifications:
-                # - Start with the current list of server classes this app has been added to
-                # - Remove the list of server classes this app should remain on
-                old_list = [name for name in self._collection if
-                            self._collection[name].apps.get(app_source.id) is not None]
-                new_list = [deployment_specification.name for deployment_specification in deployment_specifications]
-                removal_list = set(old_list) - set(new_list)
+                # Compute the set of server classes this app will be removed from to match new specifications:
+                # server classes this app has been added to, minus those this app should remain on
+                app_id = app_source.id
+                new_names = {specification.name for specification in deployment_specifications}
+                removal_list = {
+                    name for name, server_class in self._collection.items()
+                    if name not in new_names and server_class.apps.get(app_id) is not None
+                }
 
                 # First remove this app from the server classes no longer needed
                 # If we cannot remove the app because of dependency conflicts, we cannot update the mappings
@@ -594,7 +616,9 @@ class AppServerClassUpdate(object):
                 sub_package_count = 0
 
                 with io.open(package_handle, mode='w+b') as ostream:
-                    with tarfile.open(package_name, fileobj=ostream, mode='w:gz') as package:
+                    # Streaming mode writes sequentially without member bookkeeping, and keeps the temporary file's
+                    # random name out of the gzip header, so identical inputs produce identical archives
+                    with tarfile.open(fileobj=ostream, mode='w|gz', bufsize=1 << 20) as package:
                         for installation in self._additions:
                             sub_package_name = installation.partition(output_dir)
                             if sub_package_name:
@@ -606,18 +630,18 @@ class AppServerClassUpdate(object):
                 if sub_package_count == 0:
                     os.remove(package_name)
                 else:
-                    add = path.abspath(path.join(output_dir, arcname + '.tar.gz'))
-                    os.rename(package_name, add)
+                    add = path.join(path.abspath(output_dir), arcname + '.tar.gz')
+                    os.replace(package_name, add)  # atomic on POSIX and Windows, even when the package exists
             else:
                 for installation in self._additions:
                     if installation.id == app_source.id:
                         add = installation.partition(output_dir)
                         break
 
-        slim_configuration.payload.add_installation_action(OrderedDict((
-            ('serverClass', self._server_class.name),
-            ('remove', remove),
-            ('add', add)
-        )))
+        slim_configuration.payload.add_installation_action({
+            'serverClass': self._server_class.name,
+            'remove': remove,
+            'add': add
+        })
 
         return add
@@ -49,8 +49,8 @@ class _AppSourceFactory(ABCMeta):
 class AppSource(with_metaclass(_AppSourceFactory, ObjectView)):
 
     __slots__ = (
-        '_configuration', '_container', '_dependencies', '_dependency_sources', '_directory', '_id', '_manifest',
-        '_package_prefix', '_qualified_id', '_version'
+        '_configuration', '_container', '_dependencies', '_dependency_sources', '_directory', '_hash', '_id',
+        '_manifest', '_package_prefix', '_qualified_id', '_version'
     )
 
     def __init__(self, package, local_conf=None):
@@ -65,7 +65,7 @@ class AppSource(with_metaclass(_AppSourceFactory, ObjectView)):
             ('local_conf', None if local_conf is None else path.abspath(local_conf))
         ))  # pylint: disable=protected-access
         self._configuration = self._container = self._dependencies = self._dependency_sources = self._directory = None
-        self._id = self._manifest = self._package_prefix = self._qualified_id = self._version = None
+        self._hash = self._id = self._manifest = self._package_prefix = self._qualified_id = self._version = None
         self._description = None
 
         if not path.exists(self.package):
@@ -80,10 +80,17 @@ class AppSource(with_metaclass(_AppSourceFactory, ObjectView)):
     # region Special methods
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return self.id.__eq__(other.id)
 
     def __hash__(self):
-        return self.id.__hash__()
+        # Cached because AppSource objects key the dependency graph dicts, where every lookup would otherwise pay for
+        # the id property access
+        value = self._hash
+        if value is None:
+            value = self._hash = self.id.__hash__()
+        return value
 
     # endregion
 
@@ -529,7 +536,7 @@ class AppSource(with_metaclass(_AppSourceFactory, ObjectView)):
     @classmethod
     def _validate_tarinfo_of_app_root(cls, member, app_root, package_name):
 
-        if path.commonprefix((app_root, member.name)) == app_root:
+        if member.name.startswith(app_root):
             return cls._validate_tarinfo_of_app_root
 
         if member.name != SlimConstants.DEPENDENCIES_DIR:
@@ -546,7 +553,7 @@ class AppSource(with_metaclass(_AppSourceFactory, ObjectView)):
     @classmethod
     def _validate_tarinfo_of_packaged_dependencies(cls, member, app_root, package_name):
 
-        if not path.commonprefix((SlimConstants.DEPENDENCIES_DIR, member.name)) == SlimConstants.DEPENDENCIES_DIR:
+        if not member.name.startswith(SlimConstants.DEPENDENCIES_DIR):
             raise SlimError(
                 package_name, ': Expected all members of this source package to be contained by ', app_root, ' or its ',
                 SlimConstants.DEPENDENCIES_DIR, ' directory, but this file is not: ', member.name)
@@ -74,6 +74,19 @@ class SetOutputDirAction(Action):
         slim_configuration.output_dir = directory_name
 
 
+class SetCompressionLevelAction(Action):
+
+    # pylint: disable=redefined-builtin
+    def __init__(self, option_strings, dest, help=None, metavar=None):
+        Action.__init__(
+            self, option_strings, dest, type=int, choices=(0, 1, 6, 9),
+            default=slim_configuration.compression_level, help=help, metavar=metavar, nargs=1)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values[0])
+        slim_configuration.compression_level = values[0]
+
+
 class SetRepositoryAction(Action):
 
     # pylint: disable=redefined-builtin
@@ -106,6 +119,7 @@ class SlimArgumentParser(ArgumentParser):
 
         self.register('action', 'set_debug', SetDebugAction)
         self.register('action', 'set_quiet', SetQuietAction)
+        self.register('action', 'set_compression_level', SetCompressionLevelAction)
         self.register('action', 'set_output_dir', SetOutputDirAction)
         self.register('action', 'set_repository', SetRepositoryAction)
 
@@ -178,6 +192,13 @@ class SlimArgumentParser(ArgumentParser):
             ''',
             metavar='<level>')
 
+    def add_compression_level(self):
+        return self._options.add_argument(
+            '--compress-level', action='set_compression_level',
+            help='compress generated packages at this gzip level: 1, 6, or 9, or 0 to write uncompressed tarballs '
+                 'for consumers that compress in transit (default: 6)',
+            metavar='<level>')
+
     def add_combine_search_head_indexer_workloads(self):
         return self._options.add_argument(
             '-c', '--combine-search-head-indexer-workloads',
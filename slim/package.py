@@ -21,6 +21,7 @@ parser = SlimArgumentParser(
 
 parser.add_app_directory()
 parser.add_argument_help()
+parser.add_compression_level()
 parser.add_output_directory(description='app source package')
 parser.add_repository()
 parser.add_unreferenced_input_groups()
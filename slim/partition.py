@@ -25,6 +25,7 @@ parser = slim.command.SlimArgumentParser(
 
 parser.add_app_package()
 parser.add_argument_help()
+parser.add_compression_level()
 parser.add_installation()
 parser.add_output_directory(description='deployment packages')
 parser.add_repository()
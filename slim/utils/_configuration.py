@@ -42,6 +42,7 @@ class SlimConfigurationManager(object):
     def __init__(self):
 
         self._cache = None
+        self._compression_level = 6
         self._configuration_spec_path = None
         self._output_dir = None
         self._payload = None
@@ -73,6 +74,14 @@ class SlimConfigurationManager(object):
             value = self._cache = SlimCacheInfo(self.temp_directory_path)
         return value
 
+    @property
+    def compression_level(self):
+        return self._compression_level
+
+    @compression_level.setter
+    def compression_level(self, value):
+        self._compression_level = value
+
     @property
     def configuration_spec_path(self):
         return self._get_path_option('_configuration_spec_path', 'configuration_spec_path')
@@ -181,6 +190,7 @@ class SlimConfigurationManager(object):
         cls = SlimConfigurationManager
 
         self._cache = None
+        self._compression_level = 6
         self._output_dir = os.getcwd()
         self._payload = SlimPayload()
         self._configuration_spec_path = self._repository_path = self._temp_directory_path = None  # set on first access